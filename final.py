@@ -1,46 +1,85 @@
+from functools import lru_cache
+
 import numpy as np
 
 class FuzzySet:
     def __init__(self, name, universe_range):
         self.name = name
-        self.universe = np.arange(universe_range[0], universe_range[1], universe_range[2])
+        # Half-open [start, stop) grid built from an integer stride, so its length does not
+        # depend on float rounding in np.arange (e.g. for a 0.5 step)
+        start, stop, step = universe_range
+        n = int(np.ceil(round((stop - start) / step, 9)))
+        self.universe = start + step * np.arange(n, dtype=np.float64)
         self.membership_functions = {}
+        self._universe32 = None
+        self._mf_vec = None
+        self._mf_area = None
+        self._mf_moment = None
+        self._mf_matrix = None
+
+        # Parallel parameter arrays, triangles stored as trapezoids (a, b, b, c)
+        self.mf_names = []
+        self._mf_index = {}
+        self._a = np.empty(0)
+        self._b = np.empty(0)
+        self._c = np.empty(0)
+        self._d = np.empty(0)
 
     def add_mf(self, name, mf_type, params):
         """Add a membership function to the fuzzy set"""
-        self.membership_functions[name] = (mf_type, params)
-
-    def calculate_membership(self, name, x):
-        """Calculate membership value for a given input"""
-        mf_type, params = self.membership_functions[name]
-
         if mf_type == 'trimf':
-            return self._trimf(x, params)
+            a, b, c = params
+            a, b, c, d = a, b, b, c
         elif mf_type == 'trapmf':
-            return self._trapmf(x, params)
-        return 0
-
-    def _trimf(self, x, params):
-        """Triangular membership function"""
-        a, b, c = params
-        if x <= a or x >= c:
-            return 0
-        elif a < x <= b:
-            return (x - a) / (b - a)
+            a, b, c, d = params
         else:
-            return (c - x) / (c - b)
+            raise ValueError(f"Unknown membership function type: {mf_type!r}")
+        self.membership_functions[name] = (mf_type, params)
+        self._mf_vec = None
 
-    def _trapmf(self, x, params):
-        """Trapezoidal membership function"""
-        a, b, c, d = params
-        if x <= a or x >= d:
-            return 0
-        elif b <= x <= c:
-            return 1
-        elif a < x < b:
-            return (x - a) / (b - a)
+        if name in self._mf_index:
+            i = self._mf_index[name]
         else:
-            return (d - x) / (d - c)
+            i = len(self.mf_names)
+            self.mf_names.append(name)
+            self._mf_index[name] = i
+            self._a, self._b, self._c, self._d = (
+                np.append(arr, 0.0) for arr in (self._a, self._b, self._c, self._d)
+            )
+        self._a[i], self._b[i], self._c[i], self._d[i] = a, b, c, d
+
+    def eval_vec(self, x):
+        """Membership of x in every MF of the set, ordered as mf_names
+
+        A scalar x gives a (K,) vector, an array of N values gives an (N, K) matrix.
+        """
+        x = np.asarray(x, dtype=float)
+        if x.ndim:
+            x = x[..., None]
+        a, b, c, d = self._a, self._b, self._c, self._d
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rising = np.where(b > a, (x - a) / (b - a), 1.0)
+            falling = np.where(d > c, (d - x) / (d - c), 1.0)
+        y = np.where(x < b, rising, np.where(x <= c, 1.0, falling))
+        return np.where((x <= a) | (x >= d), 0.0, y)
+
+    def calculate_membership(self, name, x):
+        """Calculate membership value for a given input (scalar or array)"""
+        result = self.eval_vec(x)[..., self._mf_index[name]]
+        return result if np.ndim(x) else float(result)
+
+    def precompute_all(self):
+        """Evaluate every membership function over the universe once and cache the vectors"""
+        if self._mf_vec is None:
+            # float32 copies of the universe and MF vectors halve the bandwidth of the COG reductions
+            self._universe32 = self.universe.astype(np.float32)
+            # (K, U) matrix in mf_names order for id-based lookups, plus per-name rows
+            self._mf_matrix = np.ascontiguousarray(self.eval_vec(self.universe).T, dtype=np.float32)
+            self._mf_vec = {name: self._mf_matrix[i] for i, name in enumerate(self.mf_names)}
+            # COG partials of each unclipped MF: sum(mu) and sum(x * mu)
+            self._mf_area = self._mf_matrix.sum(axis=1, dtype=np.float64)
+            self._mf_moment = self._mf_matrix.astype(np.float64) @ self.universe
+        return self._mf_vec
 
 
 class FuzzyInferenceSystem:
@@ -49,51 +88,137 @@ class FuzzyInferenceSystem:
         self.output_sets = {}
         self.rules = []
 
+        # Rules lowered to integer (var_id, mf_id) antecedents, flattened with offsets
+        self._input_id = {}
+        self._input_list = []
+        self._rule_var_ids = np.empty(0, dtype=np.int32)
+        self._rule_mf_ids = np.empty(0, dtype=np.int32)
+        self._rule_offsets = np.empty(0, dtype=np.int32)
+        self._rule_out_mf_ids = np.empty(0, dtype=np.int32)
+        self._used_input_ids = []
+        self._first_output = None
+
     def add_input(self, name, universe_range):
         """Add an input variable"""
-        self.input_sets[name] = FuzzySet(name, universe_range)
-        return self.input_sets[name]
+        fuzzy_set = FuzzySet(name, universe_range)
+        if name not in self._input_id:
+            self._input_id[name] = len(self._input_list)
+            self._input_list.append(fuzzy_set)
+        else:
+            self._input_list[self._input_id[name]] = fuzzy_set
+        self.input_sets[name] = fuzzy_set
+        return fuzzy_set
 
     def add_output(self, name, universe_range):
         """Add an output variable"""
         self.output_sets[name] = FuzzySet(name, universe_range)
+        self._first_output = next(iter(self.output_sets.values()))
         return self.output_sets[name]
 
     def add_rule(self, antecedents, consequent):
         """Add a fuzzy rule"""
+        if not antecedents:
+            raise ValueError("A rule needs at least one antecedent")
+        var_ids = [self._input_id[var_name] for var_name, _ in antecedents]
+        mf_ids = [
+            self.input_sets[var_name]._mf_index[mf_name]
+            for var_name, mf_name in antecedents
+        ]
+
+        self._rule_offsets = np.append(self._rule_offsets, len(self._rule_var_ids)).astype(np.int32)
+        self._rule_var_ids = np.append(self._rule_var_ids, var_ids).astype(np.int32)
+        self._used_input_ids = sorted(set(self._used_input_ids) | set(var_ids))
+        self._rule_mf_ids = np.append(self._rule_mf_ids, mf_ids).astype(np.int32)
+        output_name, mf_name = consequent
+        out_mf_id = self.output_sets[output_name]._mf_index[mf_name]
+        self._rule_out_mf_ids = np.append(self._rule_out_mf_ids, out_mf_id).astype(np.int32)
         self.rules.append((antecedents, consequent))
 
     def evaluate(self, inputs):
         """Evaluate the FIS for given inputs"""
-        # Calculate rule strengths
-        rule_strengths = []
-        for antecedents, consequent in self.rules:
-            strength = 1.0
-            for var_name, mf_name in antecedents:
-                x = inputs[var_name]
-                membership = self.input_sets[var_name].calculate_membership(mf_name, x)
-                strength = min(strength, membership)
-            rule_strengths.append((strength, consequent))
+        # Fuzzify each input a rule uses once against all of its MFs, one row per var_id
+        max_mfs = max((len(fuzzy_set.mf_names) for fuzzy_set in self._input_list), default=0)
+        memberships = np.zeros((len(self._input_list), max_mfs), dtype=np.float32)
+        for var_id in self._used_input_ids:
+            fuzzy_set = self._input_list[var_id]
+            row = fuzzy_set.eval_vec(inputs[fuzzy_set.name])
+            memberships[var_id, :len(row)] = row
+
+        # Calculate rule strengths: min over each rule's slice of antecedents
+        if not self.rules:
+            return 0
+        antecedent_values = memberships[self._rule_var_ids, self._rule_mf_ids]
+        strengths = np.minimum.reduceat(antecedent_values, self._rule_offsets)
 
         # Defuzzification using center of gravity method
-        if not rule_strengths:
+        output_set = self._first_output
+        output_set.precompute_all()
+
+        # Rules sharing a consequent collapse to their strongest firing, and
+        # consequents that do not fire are dropped before the universe sweep
+        mf_strengths = np.zeros(len(output_set.mf_names), dtype=np.float32)
+        np.maximum.at(mf_strengths, self._rule_out_mf_ids, strengths)
+        active = np.nonzero(mf_strengths > 1e-12)[0]
+        if not len(active):
             return 0
 
-        output_set = list(self.output_sets.values())[0]
-        numerator = 0
-        denominator = 0
+        # A single consequent firing at full strength leaves its MF unclipped,
+        # so the COG is the precomputed centroid of that MF
+        if len(active) == 1:
+            mf_id = active[0]
+            if mf_strengths[mf_id] >= 1.0 and output_set._mf_area[mf_id] != 0:
+                return float(output_set._mf_moment[mf_id] / output_set._mf_area[mf_id])
 
-        for x in output_set.universe:
-            max_membership = 0
-            for strength, (output_name, mf_name) in rule_strengths:
-                membership = min(strength, output_set.calculate_membership(mf_name, x))
-                max_membership = max(max_membership, membership)
+        # Clip each firing consequent at its strength and aggregate with max
+        clipped = np.minimum(mf_strengths[active, None], output_set._mf_matrix[active])
+        aggregated = np.maximum.reduce(clipped, axis=0)
 
-            numerator += x * max_membership
-            denominator += max_membership
+        # float32 operands, float64 accumulators
+        numerator = float((output_set._universe32 * aggregated).sum(dtype=np.float64))
+        denominator = float(aggregated.sum(dtype=np.float64))
 
         return numerator / denominator if denominator != 0 else 0
 
+    def evaluate_batch(self, inputs):
+        """Evaluate the FIS for N scenarios at once, each input being an array of length N"""
+        # Inputs no rule uses may be omitted, as in evaluate
+        return self._evaluate_ordered(*(
+            inputs[fuzzy_set.name] if var_id in self._used_input_ids else 0.0
+            for var_id, fuzzy_set in enumerate(self._input_list)
+        ))
+
+    def _evaluate_ordered(self, *values):
+        """evaluate_batch with the input arrays given positionally, in var_id order"""
+        values = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in values))
+        n = len(values[0]) if values else 1
+        if not self.rules:
+            return np.zeros(n)
+
+        # (N, n_inputs, max_mfs) memberships, then (N, R) rule strengths
+        max_mfs = max(len(fuzzy_set.mf_names) for fuzzy_set in self._input_list)
+        memberships = np.zeros((n, len(self._input_list), max_mfs), dtype=np.float32)
+        for var_id in self._used_input_ids:
+            rows = self._input_list[var_id].eval_vec(values[var_id])
+            memberships[:, var_id, :rows.shape[1]] = rows
+        antecedent_values = memberships[:, self._rule_var_ids, self._rule_mf_ids]
+        strengths = np.minimum.reduceat(antecedent_values, self._rule_offsets, axis=1)
+
+        # Collapse rules to (N, K) per-consequent strengths, keep the consequents
+        # that fire in any scenario, then clip and aggregate over those
+        output_set = self._first_output
+        output_set.precompute_all()
+        mf_strengths = np.zeros((n, len(output_set.mf_names)), dtype=np.float32)
+        np.maximum.at(mf_strengths, (slice(None), self._rule_out_mf_ids), strengths)
+        active = np.nonzero(mf_strengths.max(axis=0, initial=0.0) > 1e-12)[0]
+        aggregated = np.minimum(
+            mf_strengths[:, active, None], output_set._mf_matrix[None, active, :]
+        ).max(axis=1, initial=0.0)
+
+        numerator = (aggregated * output_set._universe32).sum(axis=-1, dtype=np.float64)
+        denominator = aggregated.sum(axis=-1, dtype=np.float64)
+        safe = np.where(denominator != 0, denominator, 1.0)
+        return np.where(denominator != 0, numerator / safe, 0.0)
+
 
 def create_house_fis():
     fis = FuzzyInferenceSystem()
@@ -235,23 +360,60 @@ def create_loan_fis():
 
     return fis
 
+
+# evaluate_loan shares one instance of each FIS per process; create_*_fis keep
+# returning fresh objects, so callers can modify those without touching the cache
+@lru_cache(maxsize=1)
+def _shared_house_fis():
+    return create_house_fis()
+
+
+@lru_cache(maxsize=1)
+def _shared_application_fis():
+    return create_application_fis()
+
+
+@lru_cache(maxsize=1)
+def _shared_loan_fis():
+    return create_loan_fis()
+
+
 def evaluate_loan(market_value, location_value, assets_value, salary_value, interest_value):
+    """Evaluate house, application and loan amount for one scenario or an array of them
+
+    Scalar results are memoized on the exact input values.
+    """
+    # Array inputs are evaluated as one batch of scenarios
+    if any(np.ndim(v) for v in (market_value, location_value, assets_value, salary_value, interest_value)):
+        return _evaluate_loan_batch(market_value, location_value, assets_value, salary_value, interest_value)
+
+    return dict(_evaluate_loan_cached(
+        float(market_value),
+        float(location_value),
+        float(assets_value),
+        float(salary_value),
+        float(interest_value),
+    ))
+
+
+@lru_cache(maxsize=4096)
+def _evaluate_loan_cached(market_value, location_value, assets_value, salary_value, interest_value):
     # Evaluate house
-    house_fis = create_house_fis()
+    house_fis = _shared_house_fis()
     house_eval = house_fis.evaluate({
         'market_value': market_value,
         'location': location_value
     })
 
     # Evaluate application
-    app_fis = create_application_fis()
+    app_fis = _shared_application_fis()
     app_eval = app_fis.evaluate({
         'assets': assets_value,
         'salary': salary_value
     })
 
     # Evaluate loan
-    loan_fis = create_loan_fis()
+    loan_fis = _shared_loan_fis()
     loan_amount = loan_fis.evaluate({
         'house_eval': house_eval,
         'eval_app': app_eval,
@@ -266,6 +428,46 @@ def evaluate_loan(market_value, location_value, assets_value, salary_value, inte
     }
 
 
+@lru_cache(maxsize=1)
+def build_loan_pipeline():
+    """Fuse the house, application and loan FIS into one function of the five raw inputs"""
+    house_fis = _shared_house_fis()
+    app_fis = _shared_application_fis()
+    loan_fis = _shared_loan_fis()
+
+    # Resolve, once, where each stage's arguments go in its var_id order
+    def bind(fis, names):
+        run = fis._evaluate_ordered
+        order = [names.index(fuzzy_set.name) for fuzzy_set in fis._input_list]
+        return lambda *args: run(*[args[i] for i in order])
+
+    run_house = bind(house_fis, ('market_value', 'location'))
+    run_app = bind(app_fis, ('assets', 'salary'))
+    run_loan = bind(loan_fis, ('house_eval', 'eval_app', 'interest', 'salary'))
+
+    def pipeline(market_value, location_value, assets_value, salary_value, interest_value):
+        house_eval = run_house(market_value, location_value)
+        app_eval = run_app(assets_value, salary_value)
+        loan_amount = run_loan(house_eval, app_eval, interest_value, salary_value)
+        return house_eval, app_eval, loan_amount
+
+    return pipeline
+
+
+def _evaluate_loan_batch(market_value, location_value, assets_value, salary_value, interest_value):
+    # Broadcast all five inputs together so every stage, and every result, has length N
+    inputs = np.broadcast_arrays(*(
+        np.atleast_1d(np.asarray(v, dtype=float))
+        for v in (market_value, location_value, assets_value, salary_value, interest_value)
+    ))
+    house_eval, app_eval, loan_amount = build_loan_pipeline()(*inputs)
+
+    return {
+        'house_evaluation': house_eval,
+        'application_evaluation': app_eval,
+        'loan_amount': loan_amount
+    }
+
 # Test the system
 if __name__ == "__main__":
     test_cases = [
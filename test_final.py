@@ -0,0 +1,101 @@
+import unittest
+
+import numpy as np
+
+from final import FuzzyInferenceSystem, FuzzySet, create_house_fis, evaluate_loan
+
+
+# The __main__ scenarios of final.py and the results of the original
+# pure-Python implementation: (inputs, house, application, loan)
+SCENARIOS = [
+    ((900000, 9.5, 800000, 85000, 9), 8.666666666666666, 8.2, 393307.30967034854),
+    ((180000, 6.0, 250000, 45000, 5), 5.0, 5.65625, 249999.99999999843),
+    ((75000, 2.0, 30000, 20000, 8.5), 2.8, 2.0, 85522.78820375336),
+    ((120000, 8.0, 300000, 5000, 6.5), 6.5625, 1.8, 42000.0),
+    ((400000, 5.0, 400000, 60000, 4), 7.0, 8.2, 374999.99999999994),
+]
+
+# Inputs off the universe grids, including a location close to the 10 foot of 'excellent'
+OFF_GRID_SCENARIOS = [
+    ((126294, 9.76, 821301, 82755, 8.87), 7.0, 8.2, 374999.99999999994),
+    ((123456, 7.3, 333333, 47321, 5.2), 6.037656903765689, 6.0172064516129025, 312692.4266185815),
+]
+
+KEYS = ('house_evaluation', 'application_evaluation', 'loan_amount')
+
+# float32 memberships with float64 accumulation stay within ~1e-7 relative
+RTOL = 1e-6
+
+
+class EvaluateLoanTest(unittest.TestCase):
+    def test_matches_baseline(self):
+        for inputs, *expected in SCENARIOS + OFF_GRID_SCENARIOS:
+            result = evaluate_loan(*inputs)
+            for key, value in zip(KEYS, expected):
+                with self.subTest(inputs=inputs, key=key):
+                    np.testing.assert_allclose(result[key], value, rtol=RTOL)
+
+    def test_batch_matches_scalar(self):
+        rng = np.random.default_rng(0)
+        n = 200
+        columns = [
+            np.concatenate([[s[0][i] for s in SCENARIOS], rng.uniform(0, high, n)])
+            for i, high in enumerate((1000000, 10, 1000000, 100000, 10))
+        ]
+
+        batch = evaluate_loan(*columns)
+        for key in KEYS:
+            scalar = [evaluate_loan(*(c[i] for c in columns))[key] for i in range(len(columns[0]))]
+            with self.subTest(key=key):
+                np.testing.assert_allclose(batch[key], scalar, rtol=RTOL, atol=1e-9)
+
+    def test_mixed_scalar_and_array_inputs(self):
+        result = evaluate_loan(np.array([900000, 180000]), np.array([9.5, 6.0]), 800000, 85000, 9)
+        for key in KEYS:
+            with self.subTest(key=key):
+                self.assertEqual(result[key].shape, (2,))
+
+    def test_empty_batch(self):
+        empty = np.array([])
+        result = evaluate_loan(empty, empty, empty, empty, empty)
+        for key in KEYS:
+            with self.subTest(key=key):
+                self.assertEqual(result[key].shape, (0,))
+
+
+class FuzzyInferenceSystemTest(unittest.TestCase):
+    def test_evaluate_batch_matches_evaluate(self):
+        fis = create_house_fis()
+        market = np.array([0, 75000, 180000, 420000, 999999.5])
+        location = np.array([0, 2.0, 6.3, 9.76, 10])
+        batch = fis.evaluate_batch({'market_value': market, 'location': location})
+        scalar = [
+            fis.evaluate({'market_value': m, 'location': l})
+            for m, l in zip(market, location)
+        ]
+        np.testing.assert_allclose(batch, scalar, rtol=RTOL, atol=1e-9)
+
+    def test_unused_input_may_be_omitted(self):
+        fis = create_house_fis()
+        unused = fis.add_input('unused', (0, 11, 1))
+        unused.add_mf('any', 'trimf', [0, 5, 10])
+        inputs = {'market_value': 180000, 'location': 6.0}
+        self.assertAlmostEqual(fis.evaluate(inputs), 5.0)
+        np.testing.assert_allclose(fis.evaluate_batch(inputs), [5.0], rtol=RTOL)
+
+    def test_unknown_mf_type_is_rejected(self):
+        fuzzy_set = FuzzySet('x', (0, 11, 1))
+        with self.assertRaises(ValueError):
+            fuzzy_set.add_mf('bell', 'gbellmf', [1, 2, 5])
+        self.assertEqual(fuzzy_set.membership_functions, {})
+
+    def test_rule_without_antecedents_is_rejected(self):
+        fis = FuzzyInferenceSystem()
+        out = fis.add_output('y', (0, 11, 1))
+        out.add_mf('low', 'trimf', [0, 0, 5])
+        with self.assertRaises(ValueError):
+            fis.add_rule([], ('y', 'low'))
+
+
+if __name__ == '__main__':
+    unittest.main()